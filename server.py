@@ -4,11 +4,13 @@ Serves the web frontend and provides WebSocket for real-time speech sync.
 """
 
 import asyncio
-import json
 import signal
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set, Union
 
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
@@ -20,21 +22,31 @@ from word_matcher import WordMatcher
 # Configuration
 HOST = "0.0.0.0"
 PORT = 8765
+SEND_TIMEOUT = 2.0  # Seconds before a stalled client send is abandoned
+CLIENT_QUEUE_SIZE = 32  # Max pending messages per client before it is dropped
+BROADCAST_BATCH = 50  # Clients enqueued per event loop tick during a broadcast
 MODEL_PATHS = [
     "models/vosk-model-small-en-us-0.15",
     "models/vosk-model-en-us-0.22",
     "models/vosk-model-en-us-0.42-gigaspeech",
 ]
 
+PONG_MESSAGE = orjson.dumps({"type": "pong"})  # Pre-serialized heartbeat reply
+
 app = FastAPI(title="Dave's Prompter")
 
 # Global state
 speech_engine: Optional[SpeechEngine] = None
 word_matcher = WordMatcher()
 connected_clients: Set[WebSocket] = set()
+client_queues: Dict[WebSocket, asyncio.Queue] = {}
 is_running = False
 current_script = ""
 main_loop: Optional[asyncio.AbstractEventLoop] = None
+_context_cache: tuple = (None, b"null")  # (context dict, serialized context)
+_last_partial_text = ""
+_partial_seq = 0  # Bumped per scheduled partial - older ones still queued get skipped
+background_tasks: Set[asyncio.Task] = set()  # Strong refs so fire-and-forget tasks aren't collected
 
 
 class ScriptRequest(BaseModel):
@@ -47,76 +59,192 @@ class ConfigRequest(BaseModel):
     device_index: Optional[int] = None
 
 
-async def broadcast(message: dict):
-    """Broadcast a message to all connected WebSocket clients."""
+def spawn(coro) -> asyncio.Task:
+    """Schedule a fire-and-forget task, holding a reference until it finishes."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+async def close_client(websocket: WebSocket):
+    """Close a client connection, ignoring errors from already-dead sockets."""
+    try:
+        await websocket.close()
+    except Exception:
+        pass
+
+
+def remove_client(websocket: WebSocket):
+    """Stop delivering messages to a client."""
+    connected_clients.discard(websocket)
+    client_queues.pop(websocket, None)
+
+
+def drop_clients(clients: List[WebSocket]):
+    """Disconnect clients that can't keep up, rather than buffer for them without bound."""
+    if not clients:
+        return
+    
+    print(f"Client send queue full, disconnecting {len(clients)} client(s)")
+    connected_clients.difference_update(clients)
+    for client in clients:
+        client_queues.pop(client, None)
+        spawn(close_client(client))
+
+
+def enqueue(websocket: WebSocket, message_json: bytes) -> bool:
+    """Queue a message for a client without blocking. Returns False if its queue is full."""
+    queue = client_queues.get(websocket)
+    if queue is None:
+        return True  # Already disconnected
+    
+    try:
+        queue.put_nowait(message_json)
+        return True
+    except asyncio.QueueFull:
+        return False
+
+
+async def client_sender(websocket: WebSocket, queue: asyncio.Queue):
+    """Deliver queued messages to a single client, in order."""
+    try:
+        while True:
+            message_json = await queue.get()
+            await asyncio.wait_for(websocket.send_bytes(message_json), timeout=SEND_TIMEOUT)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        remove_client(websocket)
+        await close_client(websocket)
+
+
+def context_json() -> bytes:
+    """Get the serialized word matcher context, re-encoding only when it changes."""
+    global _context_cache
+    
+    context = word_matcher.get_context()
+    if context is not _context_cache[0]:
+        _context_cache = (context, orjson.dumps(context))
+    return _context_cache[1]
+
+
+def with_context(message: dict) -> bytes:
+    """Serialize a message, appending the current context to it."""
+    return orjson.dumps(message)[:-1] + b',"context":' + context_json() + b'}'
+
+
+async def broadcast(message: Union[dict, bytes]):
+    """Broadcast a message (dict or pre-serialized JSON) to all connected WebSocket clients."""
     if not connected_clients:
         return
     
-    message_json = json.dumps(message)
-    disconnected = set()
+    # Serialize once - every client is sent the same frame bytes
+    message_json = orjson.dumps(message) if isinstance(message, dict) else message
     
-    for client in connected_clients:
-        try:
-            await client.send_text(message_json)
-        except Exception:
-            disconnected.add(client)
+    # Only enqueue here - each client's sender task does the actual I/O,
+    # so a slow client never holds up the others
+    if len(connected_clients) <= BROADCAST_BATCH:
+        # Nothing yields here, so the set can't change while we iterate it
+        full = [client for client in connected_clients if not enqueue(client, message_json)]
+    else:
+        full = []
+        clients = list(connected_clients)
+        for start in range(0, len(clients), BROADCAST_BATCH):
+            if start:
+                # Yield between batches so large fan-outs don't hog the event loop
+                await asyncio.sleep(0)
+            for client in clients[start:start + BROADCAST_BATCH]:
+                if not enqueue(client, message_json):
+                    full.append(client)
     
-    # Clean up disconnected clients
-    for client in disconnected:
-        connected_clients.discard(client)
+    drop_clients(full)
 
 
 def on_partial_result(text: str):
     """Handle partial speech recognition result - THIS IS THE MAIN DRIVER."""
+    global _last_partial_text, _partial_seq
+    
+    # Skip repeated partials - nothing new to match (bursts are coalesced
+    # on the event loop, see match_partial_result)
+    if text == _last_partial_text:
+        return
+    _last_partial_text = text
+    
     # Match partials aggressively - this is what makes the prompter responsive
     words = text.split()
-    if len(words) >= 3:  # Need at least a few words
-        result = word_matcher.match_words(words)
-        
-        if result.confidence > 0 and main_loop:
-            asyncio.run_coroutine_threadsafe(broadcast({
-                "type": "match",
-                "spoken_text": text,
-                "word_index": result.word_index,
-                "confidence": result.confidence,
-                "matched_words": result.matched_words,
-                "context": word_matcher.get_context()
-            }), main_loop)
+    if len(words) >= 3 and main_loop:  # Need at least a few words
+        # Match on the event loop so the recognition thread goes straight back to decoding
+        _partial_seq += 1
+        main_loop.call_soon_threadsafe(match_partial_result, text, words, _partial_seq)
+
+
+def match_partial_result(text: str, words: List[str], seq: int):
+    """Match a partial result and broadcast the new position (runs on the event loop)."""
+    if seq != _partial_seq:
+        # A newer partial is already queued behind this one - only match the latest
+        return
+    
+    result = word_matcher.match_words(words)
+    
+    if result.confidence > 0:
+        spawn(broadcast(with_context({
+            "type": "match",
+            "spoken_text": text,
+            "word_index": result.word_index,
+            "confidence": result.confidence,
+            "matched_words": result.matched_words
+        })))
 
 
 def on_final_result(text: str):
     """Handle final speech recognition result."""
+    global _last_partial_text
+    
+    # A new utterance starts here - its first partial may repeat the last one
+    _last_partial_text = ""
+    
     words = text.split()
-    if words:
-        result = word_matcher.match_words(words)
-        
-        if main_loop:
-            asyncio.run_coroutine_threadsafe(broadcast({
-                "type": "match",
-                "spoken_text": text,
-                "word_index": result.word_index,
-                "confidence": result.confidence,
-                "matched_words": result.matched_words,
-                "context": word_matcher.get_context()
-            }), main_loop)
+    if words and main_loop:
+        main_loop.call_soon_threadsafe(match_final_result, text, words)
+
+
+def match_final_result(text: str, words: List[str]):
+    """Match a final result and broadcast the new position (runs on the event loop)."""
+    result = word_matcher.match_words(words)
+    
+    spawn(broadcast(with_context({
+        "type": "match",
+        "spoken_text": text,
+        "word_index": result.word_index,
+        "confidence": result.confidence,
+        "matched_words": result.matched_words
+    })))
 
 
 def on_words_result(words: list):
     """Handle word-level recognition results."""
-    # Extract just the words
-    word_texts = [w['word'] for w in words]
-    if word_texts:
-        result = word_matcher.match_words(word_texts)
-        
-        if main_loop:
-            asyncio.run_coroutine_threadsafe(broadcast({
-                "type": "words",
-                "words": words,
-                "word_index": result.word_index,
-                "confidence": result.confidence,
-                "matched_words": result.matched_words,
-                "context": word_matcher.get_context()
-            }), main_loop)
+    # Parallel arrays (text, start, end) instead of one dict per word
+    timings = {
+        "w": [w['word'] for w in words],
+        "s": [w['start'] for w in words],
+        "e": [w['end'] for w in words]
+    }
+    if timings["w"] and main_loop:
+        main_loop.call_soon_threadsafe(match_words_result, timings)
+
+
+def match_words_result(timings: dict):
+    """Match word-level results and broadcast the new position (runs on the event loop)."""
+    result = word_matcher.match_words(timings["w"])
+    
+    spawn(broadcast(with_context({
+        "type": "words",
+        "words": timings,
+        "word_index": result.word_index,
+        "confidence": result.confidence,
+        "matched_words": result.matched_words
+    })))
 
 
 def find_model() -> Optional[str]:
@@ -310,12 +438,14 @@ async def start_recognition():
                 content={"error": "Failed to initialize speech engine"}
             )
     
-    if not speech_engine.model:
-        if not speech_engine.load_model():
-            return JSONResponse(
-                status_code=503,
-                content={"error": "Failed to load speech model"}
-            )
+    # Returns at once if loaded, else waits for (or does) the load under the
+    # engine's lock - without blocking the loop
+    loop = asyncio.get_event_loop()
+    if not await loop.run_in_executor(None, speech_engine.load_model):
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Failed to load speech model"}
+        )
     
     if speech_engine.start():
         is_running = True
@@ -344,16 +474,18 @@ async def stop_recognition():
 @app.post("/api/reset")
 async def reset_position():
     """Reset the script position to the beginning."""
+    global _last_partial_text
+    
     word_matcher.reset()
+    _last_partial_text = ""
     
     if speech_engine:
         speech_engine.reset()
     
-    await broadcast({
+    await broadcast(with_context({
         "type": "reset",
-        "position": 0,
-        "context": word_matcher.get_context()
-    })
+        "position": 0
+    }))
     
     return {"success": True, "position": 0}
 
@@ -377,9 +509,7 @@ async def shutdown_server():
         speech_engine = None
     
     # Schedule shutdown after response is sent
-    import threading
     def delayed_exit():
-        import time
         time.sleep(0.5)
         import os
         os._exit(0)
@@ -393,42 +523,46 @@ async def shutdown_server():
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
     await websocket.accept()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    client_queues[websocket] = queue
     connected_clients.add(websocket)
+    sender = asyncio.create_task(client_sender(websocket, queue))
     
     # Send current state
-    await websocket.send_json({
+    enqueue(websocket, with_context({
         "type": "init",
         "running": is_running,
         "script": current_script,
         "word_count": word_matcher.get_word_count(),
-        "position": word_matcher.current_position,
-        "context": word_matcher.get_context()
-    })
+        "position": word_matcher.current_position
+    }))
     
     try:
         while True:
             # Handle incoming messages from client
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = orjson.loads(data)
             
             if message.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                if not enqueue(websocket, PONG_MESSAGE):
+                    drop_clients([websocket])
             
             elif message.get("type") == "goto":
                 # Manual position update
                 position = message.get("position", 0)
                 word_matcher.current_position = max(0, min(position, word_matcher.get_word_count() - 1))
-                await broadcast({
+                await broadcast(with_context({
                     "type": "position",
-                    "position": word_matcher.current_position,
-                    "context": word_matcher.get_context()
-                })
+                    "position": word_matcher.current_position
+                }))
     
     except WebSocketDisconnect:
-        connected_clients.discard(websocket)
+        pass
     except Exception as e:
         print(f"WebSocket error: {e}")
-        connected_clients.discard(websocket)
+    finally:
+        remove_client(websocket)
+        sender.cancel()
 
 
 # Mount static files (must be after API routes)
@@ -447,6 +581,8 @@ async def startup():
     # Try to initialize speech engine
     if init_speech_engine():
         print("Speech engine initialized successfully")
+        # Load the model in the background so the first Start doesn't wait on it
+        threading.Thread(target=speech_engine.load_model, daemon=True).start()
     else:
         print("Warning: Could not initialize speech engine. Download a Vosk model first.")
 
@@ -476,7 +612,9 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    uvicorn.run(app, host=HOST, port=PORT)
+    # Frames are shared by all clients; per-connection deflate would
+    # recompress the same payload once per client
+    uvicorn.run(app, host=HOST, port=PORT, ws_per_message_deflate=False)
 
 
 
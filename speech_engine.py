@@ -2,37 +2,81 @@
 Speech recognition engine using Vosk for real-time speech-to-text.
 """
 
+import collections
 import json
-import queue
 import threading
-import struct
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional, Tuple
 
+import numpy as np
 import pyaudio
 from vosk import Model, KaldiRecognizer, SetLogLevel
 
+try:
+    import soxr
+except ImportError:  # Fall back to linear interpolation
+    soxr = None
+
+try:
+    from numba import njit
+except ImportError:  # Fall back to numpy interpolation
+    njit = None
+
 # Suppress Vosk logging
 SetLogLevel(-1)
 
 # Audio configuration
 VOSK_SAMPLE_RATE = 16000  # Vosk requires 16000 Hz
 CHUNK_DURATION_MS = 250   # Chunk duration in milliseconds
+AUDIO_BUFFER_CHUNKS = 8   # Max chunks buffered before the oldest are dropped
+MAX_BATCH_MS = 1000       # Max backlog merged into a single recognizer call
+RESAMPLE_CACHE_SIZE = 8   # Max chunk lengths with cached resampling tables
+SILENCE_NOISE_RATIO = 2.0 # Audio counts as silence below this multiple of the noise floor
+SILENCE_MIN_LEVEL = 20    # Silence threshold floor (mean absolute amplitude), e.g. digital silence
+NOISE_FLOOR_RISE = 0.005  # Per-chunk rate the noise floor creeps up (drops immediately)
+SILENCE_HANGOVER_MS = 750 # Silence still decoded (word gaps, Vosk endpointing) before skipping
+SILENCE_FLUSH_MS = 2000   # Continuous silence before the utterance is finalized
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _resample_i16(samples: np.ndarray, ratio: float) -> np.ndarray:
+        """Linear interpolation resampling kernel, compiled to native code."""
+        new_length = int(samples.size * ratio)
+        resampled = np.empty(new_length, dtype=np.int16)
+        last = samples.size - 1
+        for i in range(new_length):
+            src_idx = i / ratio
+            idx = int(src_idx)
+            frac = src_idx - idx
+            if idx < last:
+                resampled[i] = int(samples[idx] * (1 - frac) + samples[idx + 1] * frac)
+            elif idx == last:
+                resampled[i] = samples[idx]
+            else:
+                resampled[i] = 0
+        return resampled
+else:
+    _resample_i16 = None
 
 
 class SpeechEngine:
     """Real-time speech recognition using Vosk."""
 
-    def __init__(self, model_path: str, device_index: Optional[int] = None):
+    def __init__(self, model_path: str, device_index: Optional[int] = None,
+                 silence_threshold: Optional[float] = None):
         """
         Initialize the speech engine.
         
         Args:
             model_path: Path to the Vosk model directory
             device_index: PyAudio device index for microphone (None for default)
+            silence_threshold: Fixed mean absolute amplitude below which audio
+                counts as silence (None to track the mic's noise floor)
         """
         self.model_path = Path(model_path)
         self.device_index = device_index
+        self.silence_threshold = silence_threshold
         self.model: Optional[Model] = None
         self.recognizer: Optional[KaldiRecognizer] = None
         self.audio: Optional[pyaudio.PyAudio] = None
@@ -40,31 +84,58 @@ class SpeechEngine:
         
         self._running = False
         self._thread: Optional[threading.Thread] = None
-        self._audio_queue: queue.Queue = queue.Queue()
+        self._model_lock = threading.Lock()
+        # Single-producer/single-consumer buffer between the PyAudio callback
+        # and the recognition thread - deque append/popleft are atomic
+        self._audio_deque: collections.deque = collections.deque(maxlen=AUDIO_BUFFER_CHUNKS)
+        self._audio_event = threading.Event()
+        self._silent_samples = 0  # Length of the current run of silence
+        self._noise_floor = 0.0  # Running estimate of the background level
+        # Set by reset() - the recognition thread resets the recognizer itself,
+        # since Vosk calls release the GIL and it may be mid-decode
+        self._reset_requested = threading.Event()
         
         # Audio settings - will be determined from device
         self._device_sample_rate: int = VOSK_SAMPLE_RATE
         self._chunk_size: int = 4000
         
+        # Streaming polyphase resampler (soxr), created once the device rate is known
+        self._resampler = None
+        
+        # Cached interpolation tables, keyed by (samples, from_rate, to_rate)
+        self._resample_cache: Dict[Tuple[int, int, int], tuple] = {}
+        
         # Callbacks
         self._on_partial: Optional[Callable[[str], None]] = None
         self._on_result: Optional[Callable[[str], None]] = None
         self._on_words: Optional[Callable[[list], None]] = None
 
     def load_model(self) -> bool:
-        """Load the Vosk model. Returns True if successful."""
-        if not self.model_path.exists():
-            print(f"Model not found at {self.model_path}")
-            return False
+        """
+        Load the Vosk model. Returns True if successful.
         
-        try:
-            self.model = Model(str(self.model_path))
-            self.recognizer = KaldiRecognizer(self.model, VOSK_SAMPLE_RATE)
-            self.recognizer.SetWords(True)  # Enable word-level timestamps
-            return True
-        except Exception as e:
-            print(f"Error loading model: {e}")
-            return False
+        Safe to call from several threads - concurrent callers wait for the
+        load already in progress instead of loading the model twice.
+        """
+        with self._model_lock:
+            if self.model is not None:
+                return True
+            
+            if not self.model_path.exists():
+                print(f"Model not found at {self.model_path}")
+                return False
+            
+            try:
+                model = Model(str(self.model_path))
+                recognizer = KaldiRecognizer(model, VOSK_SAMPLE_RATE)
+                recognizer.SetWords(True)  # Enable word-level timestamps
+                # Publish the model last - callers outside the lock treat it as "loaded"
+                self.recognizer = recognizer
+                self.model = model
+                return True
+            except Exception as e:
+                print(f"Error loading model: {e}")
+                return False
 
     def list_devices(self) -> list:
         """List available audio input devices."""
@@ -131,15 +202,13 @@ class SpeechEngine:
     def _audio_callback(self, in_data, frame_count, time_info, status):
         """PyAudio callback - receives audio data."""
         if self._running:
-            try:
-                self._audio_queue.put_nowait(in_data)
-            except:
-                pass  # Drop frame if queue is full
+            self._audio_deque.append(in_data)  # Oldest frame dropped if full
+            self._audio_event.set()
         return (None, pyaudio.paContinue)
 
     def _resample(self, data: bytes, from_rate: int, to_rate: int) -> bytes:
         """
-        Simple linear interpolation resampling.
+        Resample audio, using soxr when available and linear interpolation otherwise.
         
         Args:
             data: Raw 16-bit PCM audio data
@@ -152,60 +221,158 @@ class SpeechEngine:
         if from_rate == to_rate:
             return data
         
-        # Convert bytes to samples
-        samples = struct.unpack(f'<{len(data)//2}h', data)
+        # View bytes as samples (no copy)
+        samples = np.frombuffer(data, dtype='<i2')
+        if samples.size == 0:
+            return b''
         
-        # Calculate resampling ratio
-        ratio = to_rate / from_rate
-        new_length = int(len(samples) * ratio)
+        # Stateful polyphase resampling - better quality and no chunk-boundary artifacts
+        if self._resampler is not None:
+            return self._resampler.resample_chunk(samples).tobytes()
         
-        # Linear interpolation resampling
-        resampled = []
-        for i in range(new_length):
-            src_idx = i / ratio
-            idx = int(src_idx)
-            frac = src_idx - idx
-            
-            if idx + 1 < len(samples):
-                sample = samples[idx] * (1 - frac) + samples[idx + 1] * frac
-            else:
-                sample = samples[idx] if idx < len(samples) else 0
-            
-            resampled.append(int(sample))
+        if _resample_i16 is not None:
+            return _resample_i16(samples, to_rate / from_rate).tobytes()
+        
+        # Linear interpolation resampling - only two gathers and a multiply-add per chunk
+        idx0, idx1, w0, w1 = self._resample_tables(samples.size, from_rate, to_rate)
+        resampled = samples[idx0] * w0 + samples[idx1] * w1
         
         # Convert back to bytes
-        return struct.pack(f'<{len(resampled)}h', *resampled)
+        return resampled.astype('<i2').tobytes()
+
+    def _resample_tables(self, in_len: int, from_rate: int, to_rate: int) -> tuple:
+        """
+        Get the interpolation index/weight tables for a chunk length.
+        
+        These only depend on the rates and chunk size, which are fixed for a
+        session, so they are built once and cached.
+        """
+        key = (in_len, from_rate, to_rate)
+        tables = self._resample_cache.get(key)
+        if tables is None:
+            ratio = to_rate / from_rate
+            new_length = int(in_len * ratio)
+            pos = np.arange(new_length, dtype=np.float64) / ratio
+            idx0 = pos.astype(np.int32)
+            w1 = pos - idx0
+            idx1 = np.minimum(idx0 + 1, in_len - 1)
+            tables = (idx0, idx1, 1 - w1, w1)
+            
+            # Merged backlogs produce odd lengths - don't let those accumulate
+            if len(self._resample_cache) >= RESAMPLE_CACHE_SIZE:
+                self._resample_cache.clear()
+            self._resample_cache[key] = tables
+        return tables
 
     def _recognition_thread(self):
         """Background thread for processing audio and recognition."""
         while self._running:
-            try:
-                data = self._audio_queue.get(timeout=0.5)
-            except queue.Empty:
+            if not self._audio_event.wait(timeout=0.5):
                 continue
+            self._audio_event.clear()
             
-            # Resample if needed
-            if self._device_sample_rate != VOSK_SAMPLE_RATE:
-                data = self._resample(data, self._device_sample_rate, VOSK_SAMPLE_RATE)
-
-            if self.recognizer.AcceptWaveform(data):
-                # Final result for this utterance
-                result = json.loads(self.recognizer.Result())
-                text = result.get('text', '')
-                
-                if text and self._on_result:
-                    self._on_result(text)
+            # If we fell behind, merge the backlog into one recognizer call
+            # (bounded so partial results don't lag too far)
+            max_bytes = self._device_sample_rate * 2 * MAX_BATCH_MS // 1000
+            while self._running and self._audio_deque:
+                chunks = [self._audio_deque.popleft()]
+                size = len(chunks[0])
+                while self._audio_deque and size < max_bytes:
+                    chunk = self._audio_deque.popleft()
+                    chunks.append(chunk)
+                    size += len(chunk)
                 
-                # Word-level results with timing
-                if 'result' in result and self._on_words:
-                    self._on_words(result['result'])
-            else:
-                # Partial result
-                partial = json.loads(self.recognizer.PartialResult())
-                text = partial.get('partial', '')
-                
-                if text and self._on_partial:
-                    self._on_partial(text)
+                self._process_chunk(chunks[0] if len(chunks) == 1 else b"".join(chunks))
+
+    def _process_chunk(self, data: bytes):
+        """Feed one chunk of audio to the recognizer and dispatch results."""
+        if self._reset_requested.is_set():
+            self._reset_requested.clear()
+            self._reset_recognizer()
+        
+        # Resample if needed
+        if self._device_sample_rate != VOSK_SAMPLE_RATE:
+            data = self._resample(data, self._device_sample_rate, VOSK_SAMPLE_RATE)
+
+        # Skip decoding long silences - they only produce empty partials. Short
+        # ones (pauses between words, Vosk's own endpointing) are still decoded
+        samples = np.frombuffer(data, dtype='<i2')
+        quiet = samples.size and self._is_silence(float(np.abs(samples.astype(np.int32)).mean()))
+        silent_before = self._silent_samples
+        self._silent_samples = silent_before + samples.size if quiet else 0
+        if quiet and silent_before >= VOSK_SAMPLE_RATE * SILENCE_HANGOVER_MS // 1000:
+            # Backstop in case Vosk didn't end the utterance during the hangover
+            flush_at = VOSK_SAMPLE_RATE * SILENCE_FLUSH_MS // 1000
+            if silent_before < flush_at <= self._silent_samples:
+                self._dispatch_result(json.loads(self.recognizer.FinalResult()))
+            return
+
+        if self.recognizer.AcceptWaveform(data):
+            # Final result for this utterance
+            self._dispatch_result(json.loads(self.recognizer.Result()))
+        else:
+            # Partial result
+            partial = json.loads(self.recognizer.PartialResult())
+            text = partial.get('partial', '')
+            
+            if text and self._on_partial:
+                self._on_partial(text)
+
+    def _is_silence(self, level: float) -> bool:
+        """Whether a chunk with this mean absolute amplitude is background noise."""
+        if self.silence_threshold is not None:
+            return level < self.silence_threshold
+        
+        threshold = max(self._noise_floor * SILENCE_NOISE_RATIO, SILENCE_MIN_LEVEL)
+        # Minimum tracking: follow quieter chunks at once, louder ones only
+        # slowly, so speech doesn't drag the floor up but a noisier room does
+        if level < self._noise_floor:
+            self._noise_floor = level
+        else:
+            self._noise_floor += (level - self._noise_floor) * NOISE_FLOOR_RISE
+        return level < threshold
+
+    def _dispatch_result(self, result: dict):
+        """Pass a final recognition result to the callbacks."""
+        text = result.get('text', '')
+        
+        if text and self._on_result:
+            self._on_result(text)
+        
+        # Word-level results with timing
+        if 'result' in result and self._on_words:
+            self._on_words(result['result'])
+
+    def _supports_rate(self, device_info: dict, rate: int) -> bool:
+        """Check whether the device can capture mono 16-bit audio at the given rate."""
+        try:
+            return self.audio.is_format_supported(
+                rate,
+                input_device=device_info['index'],
+                input_channels=1,
+                input_format=pyaudio.paInt16
+            )
+        except ValueError:
+            return False
+
+    def _open_stream(self, rate: int):
+        """Open the input stream at the given sample rate."""
+        # Calculate chunk size for desired duration at this sample rate
+        chunk_size = int(rate * CHUNK_DURATION_MS / 1000)
+        
+        stream = self.audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=chunk_size,
+            stream_callback=self._audio_callback
+        )
+        
+        self._device_sample_rate = rate
+        self._chunk_size = chunk_size
+        return stream
 
     def start(self) -> bool:
         """Start speech recognition. Returns True if successful."""
@@ -230,25 +397,34 @@ class SpeechEngine:
             else:
                 device_info = self.audio.get_default_input_device_info()
             
-            self._device_sample_rate = int(device_info['defaultSampleRate'])
-            
-            # Calculate chunk size for desired duration at device sample rate
-            self._chunk_size = int(self._device_sample_rate * CHUNK_DURATION_MS / 1000)
+            # Prefer capturing at Vosk's native rate so no resampling is needed,
+            # falling back to the device default rate
+            self.stream = None
+            if self._supports_rate(device_info, VOSK_SAMPLE_RATE):
+                try:
+                    self.stream = self._open_stream(VOSK_SAMPLE_RATE)
+                except OSError:
+                    pass
+            if self.stream is None:
+                self.stream = self._open_stream(int(device_info['defaultSampleRate']))
             
             print(f"Using audio device: {device_info['name']}")
             print(f"Device sample rate: {self._device_sample_rate} Hz")
-            print(f"Resampling to: {VOSK_SAMPLE_RATE} Hz")
             
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self._device_sample_rate,
-                input=True,
-                input_device_index=self.device_index,
-                frames_per_buffer=self._chunk_size,
-                stream_callback=self._audio_callback
-            )
+            self._resampler = None
+            if self._device_sample_rate != VOSK_SAMPLE_RATE:
+                print(f"Resampling to: {VOSK_SAMPLE_RATE} Hz")
+                if soxr is not None:
+                    self._resampler = soxr.ResampleStream(
+                        self._device_sample_rate, VOSK_SAMPLE_RATE, 1, dtype='int16'
+                    )
+                elif _resample_i16 is not None:
+                    # Compile the JIT kernel now so the first real chunk isn't stalled
+                    # (same read-only frombuffer input as _resample, or numba compiles again)
+                    _resample_i16(np.frombuffer(bytes(32), dtype='<i2'), VOSK_SAMPLE_RATE / self._device_sample_rate)
             
+            self._silent_samples = 0
+            self._noise_floor = 0.0  # Device (and gain) may have changed
             self._running = True
             self._thread = threading.Thread(target=self._recognition_thread, daemon=True)
             self._thread.start()
@@ -264,12 +440,9 @@ class SpeechEngine:
         """Stop speech recognition."""
         self._running = False
         
-        # Clear the queue first to unblock the recognition thread
-        while not self._audio_queue.empty():
-            try:
-                self._audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Clear the buffer and wake the recognition thread so it can exit
+        self._audio_deque.clear()
+        self._audio_event.set()
         
         # Stop the stream
         if self.stream:
@@ -284,13 +457,23 @@ class SpeechEngine:
         if self._thread:
             self._thread.join(timeout=1.0)
             self._thread = None
+        self._silent_samples = 0
 
     def reset(self):
-        """Reset the recognizer state."""
+        """Reset the recognizer state (applied before the next chunk is decoded)."""
+        self._reset_requested.set()
+
+    def _reset_recognizer(self):
+        """Clear the recognizer - only called from the recognition thread."""
+        self._silent_samples = 0
         if self.recognizer:
-            # Create a fresh recognizer
-            self.recognizer = KaldiRecognizer(self.model, VOSK_SAMPLE_RATE)
-            self.recognizer.SetWords(True)
+            if hasattr(self.recognizer, 'Reset'):
+                # Clear decoder state in place - cheaper than rebuilding it
+                self.recognizer.Reset()
+            else:
+                # Older Vosk builds: create a fresh recognizer
+                self.recognizer = KaldiRecognizer(self.model, VOSK_SAMPLE_RATE)
+                self.recognizer.SetWords(True)
 
     def cleanup(self):
         """Clean up resources."""
@@ -21,6 +21,7 @@ class SpeechPrompter {
         this.ws = null;
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
+        this.textDecoder = new TextDecoder();
 
         // Elements
         this.elements = {};
@@ -190,6 +191,7 @@ class SpeechPrompter {
         const wsUrl = `${protocol}//${window.location.host}/ws`;
 
         this.ws = new WebSocket(wsUrl);
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
             console.log('WebSocket connected');
@@ -198,7 +200,11 @@ class SpeechPrompter {
         };
 
         this.ws.onmessage = (event) => {
-            const message = JSON.parse(event.data);
+            // Server sends UTF-8 JSON as binary frames
+            const data = typeof event.data === 'string'
+                ? event.data
+                : this.textDecoder.decode(event.data);
+            const message = JSON.parse(data);
             this.handleWebSocketMessage(message);
         };
 
@@ -7,26 +7,100 @@ then fuzzy matches entire fragments against spoken text.
 This matches how people actually read - in phrases and clauses, not individual words.
 """
 
+import functools
+import logging
 import re
+import string
+from collections import OrderedDict, namedtuple
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
+
+try:
+    from numba import njit
+except ImportError:  # Fall back to numpy reductions
+    njit = None
+
+logger = logging.getLogger(__name__)
+
+MATCH_CACHE_SIZE = 64  # Recent _find_best_fragment results kept for repeated partials
+
+# Precompiled patterns used on every script load and match
+_PARA_RE = re.compile(r'\n\s*\n')
+# Handle standard spacing AND missing spaces before capital letters (e.g. "end.Next")
+_SENT_RE = re.compile(r'(?<=[.!?])(?:\s+|$)|(?<=[.!?])(?=[A-Z])')
+_CLAUSE_RE = re.compile(r'[,;:]\s+|\s*[-–—]\s+')
+_WORD_RE = re.compile(r"[\w']+")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+class _PunctTable(dict):
+    """
+    str.translate table deleting everything _PUNCT_RE matches.
+    
+    Starts with ASCII punctuation (underscore is a word character, so it
+    stays) and learns any other code point the first time it is seen, so
+    typographic quotes, dashes and symbols take the same single pass.
+    """
+    
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = None if _PUNCT_RE.match(chr(codepoint)) else codepoint
+        self[codepoint] = value
+        return value
+
+
+_NORMALIZE_TABLE = _PunctTable({ord(c): None for c in string.punctuation.replace('_', '')})
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _best_final_score(base_scores: np.ndarray, proximity_table: np.ndarray,
+                          table_offset: int, next_idx: int) -> tuple:
+        """Apply proximity bonuses and pick the first best positive score, compiled to native code."""
+        best = -1
+        best_final = 0.0
+        for i in range(base_scores.size):
+            bonus = proximity_table[table_offset + i]
+            if i == next_idx and base_scores[i] >= 55:
+                bonus = 30
+            final = base_scores[i] + bonus
+            if final > best_final:
+                best = i
+                best_final = final
+        return best, best_final
+else:
+    _best_final_score = None
 
 
 @dataclass
 class Fragment:
     """A fragment of the script (phrase/clause)."""
+    __slots__ = ('text', 'normalized', 'index', 'word_start', 'word_end', 'words')
+    
     text: str               # Original text
     normalized: str         # Lowercase, cleaned for matching
     index: int              # Fragment index
     word_start: int         # Starting word index in full script
     word_end: int           # Ending word index in full script
+    words: Tuple[str, ...]  # Words of the fragment, tokenized once
+
+
+def _token_set(text: str) -> str:
+    """Sorted, de-duplicated tokens of normalized text, as token_set_ratio sees them."""
+    return " ".join(sorted(set(text.split())))
+
+
+# A single script word, as returned by get_word_at()
+Word = namedtuple('Word', 'text index')
 
 
 @dataclass
 class MatchResult:
     """Result of matching."""
+    __slots__ = ('word_index', 'fragment_index', 'confidence', 'matched_words')
+    
     word_index: int         # Current word position
     fragment_index: int     # Current fragment index
     confidence: float       # Match confidence (0-1)
@@ -43,9 +117,20 @@ class WordMatcher:
 
     def __init__(self):
         self.fragments: List[Fragment] = []
+        self._words: List[str] = []  # Every script word, by global word index
+        self._lower_words: List[Tuple[str, ...]] = []  # Per fragment, for intra-fragment tracking
+        
+        # Per-fragment data laid out for batch scoring
+        self._token_sets: List[str] = []  # Sorted, de-duplicated fragment tokens
+        self._fragment_lengths = np.zeros(0, dtype=np.int32)
+        self._word_starts = np.zeros(0, dtype=np.int32)
+        
+        # Consecutive partials often repeat the same phrase - reuse batch scores
+        # (keyed on strings/ints only, cleared whenever fragments change)
+        self._cached_scores = functools.lru_cache(maxsize=128)(self._score_fragments)
         self.current_fragment: int = 0
         self.current_position: int = 0  # Word position for display
-        self.matched_positions: List[int] = []
+        self.matched_positions: Set[int] = set()
         
         # Fragment matching threshold (0-100)
         self.match_threshold = 55
@@ -53,9 +138,35 @@ class WordMatcher:
         # Maximum words we can jump at once (prevents wild jumps)
         self.max_jump = 25
         
+        # Maximum fragments we can jump back (the backward penalty swamps
+        # any fuzzy gain beyond this)
+        self.max_back = 4
+        
+        # Maximum fragments we can jump ahead (on top of the max_jump word limit)
+        self.max_ahead = 8
+        
         # How much to weight proximity to current position
         self.proximity_weight = 20
         
+        # Proximity bonus indexed by (fragment offset + bias), built on first use
+        self._proximity_table: Optional[np.ndarray] = None
+        self._proximity_bias = 0
+        
+        # Last get_context() result, reused while the position is unchanged
+        self._context_cache: Optional[tuple] = None
+        
+        # (spoken words, best fragment) from the last confident match
+        self._last_match: Optional[tuple] = None
+        
+        # (spoken text, normalized, token set) - growing partials repeat the same phrase
+        self._last_spoken: tuple = ("", "", "")
+        
+        # (last spoken words tuple, joined text) for the match_words tail
+        self._last_tail: tuple = ((), "")
+        
+        # (spoken text, current fragment, min fragment) -> _find_best_fragment result
+        self._match_cache: OrderedDict = OrderedDict()
+        
     def set_script(self, text: str):
         """
         Parse script into fragments.
@@ -68,13 +179,14 @@ class WordMatcher:
         self.fragments = []
         self.current_fragment = 0
         self.current_position = 0
-        self.matched_positions = []
+        self.matched_positions = set()
+        self._clear_caches()
         
         word_position = 0
         fragment_idx = 0
         
         # First, split into paragraphs (hard boundaries - never combine across these)
-        paragraphs = re.split(r'\n\s*\n', text)
+        paragraphs = _PARA_RE.split(text)
         
         for para in paragraphs:
             para = para.strip()
@@ -83,8 +195,7 @@ class WordMatcher:
             
             # Within paragraph, split by sentence-ending punctuation
             # Keep the punctuation with the sentence
-            # Handle standard spacing AND missing spaces before capital letters (e.g. "end.Next")
-            sentences = re.split(r'(?<=[.!?])(?:\s+|$)|(?<=[.!?])(?=[A-Z])', para)
+            sentences = _SENT_RE.split(para)
             
             for sentence in sentences:
                 sentence = sentence.strip()
@@ -92,9 +203,11 @@ class WordMatcher:
                     continue
                 
                 # Within sentence, split by clause markers (commas, semicolons, etc)
-                clauses = re.split(r'[,;:]\s+|\s*[-–—]\s+', sentence)
+                clauses = _CLAUSE_RE.split(sentence)
                 
-                pending_text = ""
+                # Clauses (and their words) waiting to become a fragment
+                pending_clauses: List[str] = []
+                pending_words: List[str] = []
                 pending_word_start = word_position
                 
                 for clause in clauses:
@@ -102,60 +215,82 @@ class WordMatcher:
                     if not clause:
                         continue
                     
-                    words = re.findall(r"[\w']+", clause)
+                    words = _WORD_RE.findall(clause)
                     if not words:
                         continue
                     
                     # Accumulate short clauses within the same sentence
-                    if pending_text:
-                        pending_text += ", " + clause
-                    else:
-                        pending_text = clause
+                    if not pending_clauses:
                         pending_word_start = word_position
+                    pending_clauses.append(clause)
+                    pending_words.extend(words)
                     
                     word_position += len(words)
                     
                     # Create fragment if we have at least 3 words
-                    pending_words = re.findall(r"[\w']+", pending_text)
                     if len(pending_words) >= 3:
+                        pending_text = ", ".join(pending_clauses)
                         self.fragments.append(Fragment(
                             text=pending_text,
                             normalized=self._normalize(pending_text),
                             index=fragment_idx,
                             word_start=pending_word_start,
-                            word_end=word_position - 1
+                            word_end=word_position - 1,
+                            words=tuple(pending_words)
                         ))
                         fragment_idx += 1
-                        pending_text = ""
+                        pending_clauses = []
+                        pending_words = []
                 
                 # Flush any remaining text from this sentence (even if short)
-                if pending_text:
+                if pending_clauses:
+                    pending_text = ", ".join(pending_clauses)
                     self.fragments.append(Fragment(
                         text=pending_text,
                         normalized=self._normalize(pending_text),
                         index=fragment_idx,
                         word_start=pending_word_start,
-                        word_end=word_position - 1
+                        word_end=word_position - 1,
+                        words=tuple(pending_words)
                     ))
                     fragment_idx += 1
-                    pending_text = ""
+        
+        # Flat word list for O(1) word lookups
+        self._words = []
+        for f in self.fragments:
+            self._words.extend(f.words)
+        self._lower_words = [tuple(_WORD_RE.findall(f.text.lower())) for f in self.fragments]
+        
+        # token_set_ratio splits, de-duplicates and sorts both sides on every
+        # comparison - do it once for the fragment side (same scores)
+        self._token_sets = [_token_set(f.normalized) for f in self.fragments]
+        
+        # Numeric per-fragment columns (structure-of-arrays) for vectorized
+        # length penalties and searchsorted candidate windows
+        n = len(self.fragments)
+        self._fragment_lengths = np.fromiter((len(f.normalized) for f in self.fragments), dtype=np.int32, count=n)
+        self._word_starts = np.fromiter((f.word_start for f in self.fragments), dtype=np.int32, count=n)
+        
+        if _best_final_score is not None:
+            # Compile the JIT kernel now so the first spoken phrase isn't stalled
+            self._best_final(self.current_fragment, self.current_fragment + 1, np.zeros(1))
+        
+        logger.info("Parsed %d fragments from script", len(self.fragments))
         
         # Debug output - show ALL fragments so we can see what's happening
-        print(f"[Matcher] Parsed {len(self.fragments)} fragments from script")
-        print(f"[Matcher] === ALL FRAGMENTS ===")
-        for i, f in enumerate(self.fragments):
-            # Truncate long text for readability
-            display_text = f.text[:60] + "..." if len(f.text) > 60 else f.text
-            print(f"  [{i}] words {f.word_start:3d}-{f.word_end:3d}: '{display_text}'")
-        print(f"[Matcher] === END FRAGMENTS ===")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("=== ALL FRAGMENTS ===")
+            for i, f in enumerate(self.fragments):
+                # Truncate long text for readability
+                display_text = f.text[:60] + "..." if len(f.text) > 60 else f.text
+                logger.debug("  [%d] words %3d-%3d: '%s'", i, f.word_start, f.word_end, display_text)
+            logger.debug("=== END FRAGMENTS ===")
     
     def _normalize(self, text: str) -> str:
         """Normalize text for matching."""
         # Lowercase, remove punctuation, normalize whitespace
-        text = text.lower()
-        text = re.sub(r"[^\w\s]", "", text)
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
+        text = text.lower().translate(_NORMALIZE_TABLE)
+        return " ".join(text.split())
     
     def get_word_count(self) -> int:
         """Get total word count."""
@@ -163,17 +298,11 @@ class WordMatcher:
             return 0
         return self.fragments[-1].word_end + 1
     
-    def get_word_at(self, index: int):
+    def get_word_at(self, index: int) -> Optional[Word]:
         """Get word at index (for compatibility)."""
-        # Find which fragment contains this word
-        for f in self.fragments:
-            if f.word_start <= index <= f.word_end:
-                # Extract the word from the fragment
-                words = re.findall(r"[\w']+", f.text)
-                word_offset = index - f.word_start
-                if 0 <= word_offset < len(words):
-                    return type('Word', (), {'text': words[word_offset], 'index': index})()
-        return None
+        if not 0 <= index < len(self._words):
+            return None
+        return Word(self._words[index], index)
     
     def get_current_word(self):
         return self.get_word_at(self.current_position)
@@ -182,7 +311,17 @@ class WordMatcher:
         """Reset to beginning."""
         self.current_fragment = 0
         self.current_position = 0
-        self.matched_positions = []
+        self.matched_positions = set()
+        self._clear_caches()
+    
+    def _clear_caches(self):
+        """Drop every cached match/context result - call whenever fragments or position reset."""
+        self._context_cache = None
+        self._last_match = None
+        self._last_spoken = ("", "", "")
+        self._last_tail = ((), "")
+        self._match_cache.clear()
+        self._cached_scores.cache_clear()
     
     def _score_fragment(self, spoken_normalized: str, fragment: Fragment) -> float:
         """
@@ -199,91 +338,204 @@ class WordMatcher:
         score = fuzz.token_set_ratio(spoken_normalized, fragment.normalized)
         
         # Penalize if lengths are very different (prevents partial word matches)
-        len_ratio = min(len(spoken_normalized), len(fragment.normalized)) / max(len(spoken_normalized), len(fragment.normalized))
-        if len_ratio < 0.3:
+        # i.e. shorter/longer < 0.3, compared in integers
+        spoken_len = len(spoken_normalized)
+        fragment_len = len(fragment.normalized)
+        if min(spoken_len, fragment_len) * 10 < max(spoken_len, fragment_len) * 3:
             score *= 0.7  # Significant penalty for very different lengths
         
         return score
     
-    def _find_best_fragment(self, spoken_text: str, verbose: bool = False) -> tuple:
+    def _score_fragments(self, spoken_tokens: str, spoken_len: int, lo: int, hi: int,
+                         score_cutoff: float = 0) -> np.ndarray:
+        """
+        Score spoken text against fragments lo..hi-1 in a single batch.
+        
+        Same scoring as _score_fragment, vectorized, taking the spoken side
+        as its token set (see _token_set) and normalized length. Fragments
+        whose fuzzy score is below score_cutoff score 0. Callers go through
+        _cached_scores, so the returned array must not be modified.
+        """
+        scores = process.cdist(
+            [spoken_tokens],
+            self._token_sets[lo:hi],
+            scorer=fuzz.token_set_ratio,
+            score_cutoff=score_cutoff,
+            dtype=np.float64,
+            workers=1
+        )[0]
+        
+        # Penalize if lengths are very different (prevents partial word matches)
+        lengths = self._fragment_lengths[lo:hi]
+        too_different = np.minimum(lengths, spoken_len) * 10 < np.maximum(lengths, spoken_len) * 3
+        return np.where(too_different, scores * 0.7, scores)
+    
+    def _build_proximity_table(self, bias: int):
+        """Precompute the bonus for every fragment offset in -bias..bias."""
+        offsets = np.arange(-bias, bias + 1)
+        # Further ahead: penalty (prevents jumping too far ahead prematurely)
+        # Going backward: heavy penalty
+        table = np.where(offsets > 0, -offsets * 5, offsets * 10).astype(np.int16)
+        table[bias] = 20  # CURRENT fragment: bonus to prevent premature jumps
+        table[bias + 1] = 5  # NEXT fragment: weak match (see _proximity_bonus)
+        self._proximity_table = table
+        self._proximity_bias = bias
+    
+    def _ensure_proximity_table(self, lo: int, hi: int):
+        """Make sure the proximity table covers fragments lo..hi-1."""
+        reach = max(self.current_fragment - lo, hi - self.current_fragment)
+        if self._proximity_table is None or reach > self._proximity_bias:
+            self._build_proximity_table(max(reach, self.max_back, self.max_jump) + 1)
+    
+    def _proximity_bonus(self, lo: int, hi: int, base_scores: np.ndarray) -> np.ndarray:
+        """Proximity bonus/penalty for fragments lo..hi-1 - STRONGLY favor moving forward."""
+        cur = self.current_fragment
+        self._ensure_proximity_table(lo, hi)
+        bias = self._proximity_bias
+        bonus = self._proximity_table[lo - cur + bias:hi - cur + bias]
+        
+        # NEXT fragment: if it matches WELL (>55), give it priority to advance
+        # This lets us move forward when user starts reading the next sentence
+        if lo <= cur + 1 < hi and base_scores[cur + 1 - lo] >= 55:
+            bonus = bonus.copy()
+            bonus[cur + 1 - lo] = 30
+        return bonus
+    
+    def _best_final(self, lo: int, hi: int, base_scores: np.ndarray) -> tuple:
+        """
+        Best fragment in lo..hi-1 once proximity is applied.
+        
+        Returns (offset from lo, final score), or (-1, 0.0) if no final
+        score is above 0. Ties go to the earliest fragment.
+        """
+        if _best_final_score is not None:
+            self._ensure_proximity_table(lo, hi)
+            cur = self.current_fragment
+            best, best_final = _best_final_score(base_scores, self._proximity_table,
+                                                 lo - cur + self._proximity_bias, cur + 1 - lo)
+            return (int(best), float(best_final))
+        
+        final_scores = base_scores + self._proximity_bonus(lo, hi, base_scores)
+        best = int(np.argmax(final_scores))
+        if final_scores[best] > 0:
+            return (best, float(final_scores[best]))
+        return (-1, 0.0)
+    
+    def _find_best_fragment(self, spoken_text: str, verbose: bool = False,
+                            min_fragment: Optional[int] = None) -> tuple:
         """
         Find which fragment best matches the spoken text.
         
-        Checks ALL fragments but weights by proximity to current position.
-        This allows re-reading and going back.
+        Only fragments in a window around the current one are candidates:
+        up to max_back behind (so re-reading and going back still work) and
+        up to max_ahead / max_jump words ahead. Scores are weighted by
+        proximity. The current and next fragment are scored first; the rest
+        of the window only needs scoring if it could still beat them, which
+        becomes the fuzzy score cutoff for those far blocks.
+        
+        Args:
+            spoken_text: Text to match
+            verbose: Log the top candidates
+            min_fragment: Raise the window start to this index - match_words
+                passes the last confident match when a partial grows, so
+                fragments already read past aren't rescored
         
         Returns: (best_fragment_index, score, is_confident)
         """
-        if not spoken_text or not self.fragments:
+        fragments = self.fragments
+        if not spoken_text or not fragments:
             return (self.current_fragment, 0, False)
         
-        spoken_normalized = self._normalize(spoken_text)
+        cache_key = (spoken_text, self.current_fragment, min_fragment)
+        cached = self._match_cache.get(cache_key)
+        if cached is not None:
+            self._match_cache.move_to_end(cache_key)
+            return cached
+        
+        if spoken_text == self._last_spoken[0]:
+            _, spoken_normalized, spoken_tokens = self._last_spoken
+        else:
+            spoken_normalized = self._normalize(spoken_text)
+            spoken_tokens = _token_set(spoken_normalized)
+            self._last_spoken = (spoken_text, spoken_normalized, spoken_tokens)
+        spoken_len = len(spoken_normalized)
         
         # Skip if too short to match reliably (about 2 words minimum)
-        if len(spoken_normalized) < 6:
+        if spoken_len < 6:
             return (self.current_fragment, 0, False)
         
-        best_idx = self.current_fragment
+        cur = self.current_fragment
+        best_idx = cur
         best_score = 0
-        all_scores = []  # For logging
         
         # Calculate the word position limit (can't jump too far)
-        current_word_pos = self.fragments[self.current_fragment].word_end if self.current_fragment < len(self.fragments) else 0
+        current_word_pos = fragments[cur].word_end if cur < len(fragments) else 0
         max_word_pos = current_word_pos + self.max_jump
         
-        for fragment in self.fragments:
-            # Skip fragments that are too far ahead
-            if fragment.word_start > max_word_pos:
-                continue
-            # Base score from fuzzy matching
-            base_score = self._score_fragment(spoken_normalized, fragment)
-            
-            # Proximity bonus/penalty - STRONGLY favor moving forward
-            distance = abs(fragment.index - self.current_fragment)
-            
-            if fragment.index == self.current_fragment:
-                # CURRENT fragment: bonus to prevent premature jumps
-                proximity_bonus = 20
-            elif fragment.index == self.current_fragment + 1:
-                # NEXT fragment: if it matches WELL (>55), give it priority to advance
-                # This lets us move forward when user starts reading the next sentence
-                if base_score >= 55:
-                    proximity_bonus = 30  # Beats current fragment bonus
-                else:
-                    proximity_bonus = 5   # Low bonus unless it matches well
-            elif fragment.index > self.current_fragment:
-                # Further ahead: penalty
-                # Increase penalty to prevent jumping too far ahead prematurely
-                proximity_bonus = -distance * 5
-            else:
-                # Going backward: heavy penalty
-                proximity_bonus = -distance * 10
+        # Candidates are a contiguous run: fragments are ordered by word_start,
+        # so skip those too far ahead or behind (and before min_fragment) up front
+        lo = max(min_fragment or 0, cur - self.max_back)
+        hi = min(int(np.searchsorted(self._word_starts, max_word_pos, side='right')),
+                 cur + self.max_ahead + 1)
+        
+        if lo < hi:
+            base_scores = np.zeros(hi - lo)
             
-            final_score = base_score + proximity_bonus
+            # Score the current and next fragment first - they are the only
+            # candidates with a positive proximity bonus, so they set the bar
+            near_lo = min(max(lo, cur), hi)
+            near_hi = max(min(hi, cur + 2), near_lo)
+            best_near = 0.0
+            if near_lo < near_hi:
+                near_scores = self._cached_scores(spoken_tokens, spoken_len, near_lo, near_hi, 0)
+                base_scores[near_lo - lo:near_hi - lo] = near_scores
+                best_near = self._best_final(near_lo, near_hi, near_scores)[1]
             
-            # Track for logging
-            if base_score > 30:  # Only log meaningful scores
-                all_scores.append((fragment.index, base_score, final_score, fragment.text[:30]))
+            # Everything else is penalized by at least 10, so it can only win with
+            # a base score that much higher - let rapidfuzz skip the rest early
+            cutoff = best_near + 10
+            if cutoff <= 100:
+                if lo < near_lo:
+                    base_scores[:near_lo - lo] = self._cached_scores(spoken_tokens, spoken_len, lo, near_lo, cutoff)
+                if near_hi < hi:
+                    base_scores[near_hi - lo:] = self._cached_scores(spoken_tokens, spoken_len, near_hi, hi, cutoff)
             
-            if final_score > best_score:
-                best_score = final_score
-                best_idx = fragment.index
-        
-        # Is this a confident match?
-        raw_best_score = self._score_fragment(spoken_normalized, self.fragments[best_idx])
+            best, final = self._best_final(lo, hi, base_scores)
+            if best >= 0:
+                best_score = final
+                best_idx = lo + best
+        
+        # Is this a confident match? The winner's raw score is already in
+        # base_scores (anything that can win was scored above the cutoff)
+        if lo <= best_idx < hi:
+            raw_best_score = float(base_scores[best_idx - lo])
+        else:
+            raw_best_score = self._score_fragment(spoken_normalized, fragments[best_idx])
         is_confident = raw_best_score >= self.match_threshold
         
-        # Detailed logging
-        if verbose or len(spoken_normalized) > 15:
-            print(f"\n[Match] Spoken: '{spoken_text[:50]}...' (normalized: {len(spoken_normalized)} chars)")
-            print(f"[Match] Current fragment: {self.current_fragment}")
-            print(f"[Match] Top matches:")
-            for idx, base, final, text in sorted(all_scores, key=lambda x: -x[2])[:5]:
+        # Detailed logging - skip building it entirely unless someone is listening
+        if (verbose or spoken_len > 15) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Spoken: '%s...' (normalized: %d chars)", spoken_text[:50], spoken_len)
+            logger.debug("Current fragment: %d", cur)
+            logger.debug("Top matches:")
+            top = []
+            if lo < hi:
+                # Only log meaningful scores
+                final_scores = base_scores + self._proximity_bonus(lo, hi, base_scores)
+                top = [i for i in np.argsort(-final_scores, kind='stable') if base_scores[i] > 30][:5]
+            for i in top:
+                idx = lo + int(i)
                 marker = " <-- BEST" if idx == best_idx else ""
-                print(f"        [{idx}] base={base:.0f} final={final:.0f} '{text}...'{marker}")
-            print(f"[Match] Best: frag {best_idx}, raw={raw_best_score:.0f}, threshold={self.match_threshold}, confident={is_confident}")
-        
-        return (best_idx, best_score, is_confident)
+                logger.debug("        [%d] base=%.0f final=%.0f '%s...'%s",
+                             idx, base_scores[i], final_scores[i], fragments[idx].text[:30], marker)
+            logger.debug("Best: frag %d, raw=%.0f, threshold=%d, confident=%s",
+                         best_idx, raw_best_score, self.match_threshold, is_confident)
+        
+        result = (best_idx, best_score, is_confident)
+        self._match_cache[cache_key] = result
+        if len(self._match_cache) > MATCH_CACHE_SIZE:
+            self._match_cache.popitem(last=False)
+        return result
     
     def match_words(self, spoken_words: List[str]) -> MatchResult:
         """
@@ -297,19 +549,40 @@ class WordMatcher:
                 matched_words=[]
             )
         
+        # Vosk partials grow within an utterance - if this phrase extends the
+        # last confident one, resume from the fragment it matched instead of
+        # rescanning everything behind it
+        words_key = tuple(spoken_words)
+        min_fragment = None
+        if self._last_match is not None:
+            last_words, last_best = self._last_match
+            prefix = 0
+            for old, new in zip(last_words, words_key):
+                if old != new:
+                    break
+                prefix += 1
+            if prefix >= len(last_words) / 2:
+                min_fragment = last_best
+        
         # IMPORTANT: Only use the last N words, not the entire accumulated text
         # Vosk accumulates speech, but we only care about recent words
         # to detect which fragment the user is currently reading
         max_words = 15  # About 1-2 fragments worth
-        if len(spoken_words) > max_words:
-            spoken_words = spoken_words[-max_words:]
+        spoken_words = words_key[-max_words:]
         
-        # Join words back into text for fragment matching
-        spoken_text = " ".join(spoken_words)
+        # Join words back into text for fragment matching (unless it's the same tail again)
+        if spoken_words == self._last_tail[0]:
+            spoken_text = self._last_tail[1]
+        else:
+            spoken_text = " ".join(spoken_words)
+            self._last_tail = (spoken_words, spoken_text)
         
         # Enable verbose logging for longer phrases
         verbose = len(spoken_words) >= 4
-        best_idx, score, is_confident = self._find_best_fragment(spoken_text, verbose=verbose)
+        best_idx, score, is_confident = self._find_best_fragment(
+            spoken_text, verbose=verbose, min_fragment=min_fragment
+        )
+        self._last_match = (words_key, best_idx) if is_confident else None
         
         matched_words = []
         
@@ -326,25 +599,24 @@ class WordMatcher:
                 # Mark the PREVIOUS fragment as matched (grey it out)
                 if old_frag < len(self.fragments):
                     prev_frag = self.fragments[old_frag]
-                    for i in range(prev_frag.word_start, prev_frag.word_end + 1):
-                        if i not in self.matched_positions:
-                            self.matched_positions.append(i)
-                        matched_words.append(i)
+                    prev_range = range(prev_frag.word_start, prev_frag.word_end + 1)
+                    self.matched_positions.update(prev_range)
+                    matched_words.extend(prev_range)
                 
-                # ALWAYS print when moving - this is important debug info
-                print(f"[Match] MOVED: frag {old_frag} -> {best_idx}")
-                print(f"        Spoken: '{spoken_text[:50]}...'")
-                print(f"        Matched: '{fragment.text[:50]}...'")
-                print(f"        Position: {self.current_position}, Greyed: {matched_words}")
+                # Log every move - this is the most useful trace when tuning
+                logger.info("MOVED: frag %d -> %d", old_frag, best_idx)
+                logger.debug("        Spoken: '%s...'", spoken_text[:50])
+                logger.debug("        Matched: '%s...'", fragment.text[:50])
+                logger.debug("        Position: %d, Greyed: %s", self.current_position, matched_words)
             elif verbose:
-                print(f"[Match] STAYING at fragment {best_idx} (already there)")
+                logger.debug("STAYING at fragment %d (already there)", best_idx)
 
             # --- INTRA-FRAGMENT TRACKING ---
             # Now try to match specific words WITHIN the current fragment
             # This allows us to highlight words as they are spoken, not just at the end
             if best_idx == self.current_fragment:
                 # Get the words in the current fragment
-                frag_words = re.findall(r"[\w']+", fragment.text.lower())
+                frag_words = self._lower_words[best_idx]
                 
                 # Try to match the tail of spoken words to words in the fragment
                 # We only care about the last few spoken words
@@ -361,12 +633,13 @@ class WordMatcher:
                         self.current_position = new_pos
                         
                         # Mark words up to this point as matched
+                        matched = self.matched_positions
                         for i in range(fragment.word_start, new_pos + 1):
-                            if i not in self.matched_positions:
-                                self.matched_positions.append(i)
+                            if i not in matched:
+                                matched.add(i)
                                 matched_words.append(i)
         elif verbose:
-            print(f"[Match] NO MOVE: score {score:.0f} not confident enough")
+            logger.debug("NO MOVE: score %.0f not confident enough", score)
         
         return MatchResult(
             word_index=self.current_position,
@@ -375,7 +648,7 @@ class WordMatcher:
             matched_words=matched_words
         )
 
-    def _match_words_in_fragment(self, spoken_words: List[str], frag_words: List[str]) -> Optional[int]:
+    def _match_words_in_fragment(self, spoken_words: List[str], frag_words: Tuple[str, ...]) -> Optional[int]:
         """
         Find the best matching word index in the fragment for the spoken words.
         Returns the index relative to the fragment start.
@@ -416,60 +689,70 @@ class WordMatcher:
     def match_partial(self, partial_text: str) -> Optional[int]:
         """
         Match partial recognition for real-time preview.
-        More aggressive than full matching for responsiveness.
+        
+        Returns the word position the partial points at, or None if it
+        doesn't match confidently. Does not move the matcher.
         """
         if not partial_text or not self.fragments:
             return None
         
-        # Use the same matching as match_words for consistency
+        # Partials are speculative - score them the same way as match_words,
+        # but leave the matcher state alone
         words = partial_text.split()
         if len(words) >= 2:
-            result = self.match_words(words)
-            if result.confidence > 0:
-                return result.word_index
+            best_idx, score, is_confident = self._find_best_fragment(" ".join(words[-15:]))
+            if is_confident:
+                if best_idx == self.current_fragment:
+                    return self.current_position
+                return self.fragments[best_idx].word_start
         
         return None
     
+    def _context_words(self, start: int, end: int) -> List[dict]:
+        """Display entries for words start..end-1 (clipped to the script)."""
+        words = self._words
+        matched = self.matched_positions
+        return [
+            {
+                'index': i,
+                'text': words[i],
+                'matched': i in matched
+            }
+            for i in range(max(start, 0), min(end, len(words)))
+        ]
+    
     def get_context(self, before: int = 3, after: int = 10) -> dict:
-        """Get words around current position for display."""
+        """
+        Get words around current position for display.
+        
+        The result is cached and the same object is returned until the
+        position or matched words change, so callers must not mutate it.
+        """
+        key = (before, after, self.current_position, self.current_fragment, len(self.matched_positions))
+        if self._context_cache is not None and self._context_cache[0] == key:
+            return self._context_cache[1]
+        
         # Find current fragment
         current_frag = None
         if 0 <= self.current_fragment < len(self.fragments):
             current_frag = self.fragments[self.current_fragment]
         
         current = self.current_position
-        total_words = self.get_word_count()
-        
-        before_words = []
-        for i in range(max(0, current - before), current):
-            word = self.get_word_at(i)
-            if word:
-                before_words.append({
-                    'index': i,
-                    'text': word.text,
-                    'matched': i in self.matched_positions
-                })
+        total_words = len(self._words)
+        
+        before_words = self._context_words(max(0, current - before), current)
         
         current_word = None
-        word = self.get_word_at(current)
-        if word:
+        if 0 <= current < total_words:
             current_word = {
                 'index': current,
-                'text': word.text,
+                'text': self._words[current],
                 'matched': current in self.matched_positions
             }
         
-        after_words = []
-        for i in range(current + 1, min(total_words, current + after + 1)):
-            word = self.get_word_at(i)
-            if word:
-                after_words.append({
-                    'index': i,
-                    'text': word.text,
-                    'matched': i in self.matched_positions
-                })
-        
-        return {
+        after_words = self._context_words(current + 1, current + after + 1)
+        
+        context = {
             'before': before_words,
             'current': current_word,
             'after': after_words,
@@ -478,9 +761,13 @@ class WordMatcher:
             'fragment': self.current_fragment,
             'total_fragments': len(self.fragments)
         }
+        self._context_cache = (key, context)
+        return context
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    
     matcher = WordMatcher()
     
     script = """